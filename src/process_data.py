@@ -1,3 +1,4 @@
+import asyncio
 import os
 from litellm import batch_completion
 from dotenv import load_dotenv
@@ -8,27 +9,29 @@ importlib.reload(parsing)
 from utils.parsing import parse_workbook_all_sheets_to_markdown
 from utils.prompt_loader import load_json_generator_prompts, load_report_generator_prompts
 from utils.parsing_answer import parse_json_and_schema, replace_original_table_in_report
+from utils.file_io import write_text_atomic
 import json
 import litellm
 import jsonschema
 
 MODEL = os.environ.get("LLM_MODEL", "gpt-4.1")  # 예: LLM_MODEL=gpt-4o
 
+def _markdown_for(file_path: Path) -> str:
+    """워크북 전체 시트를 LLM 입력용 마크다운으로 변환합니다."""
+    return parse_workbook_all_sheets_to_markdown(
+        file_path,
+        max_total_chars=300_000,
+        max_rows_per_sheet=2000,
+        save_combined_markdown=False,
+    )
+
 def process_batch(file_paths: list, project_root: Path):
     """파일 배치를 한 번에 처리합니다 (최대 10개)."""
     json_generator_prompts = load_json_generator_prompts()
     report_generator_prompts = load_report_generator_prompts()
 
     # 각 파일의 마크다운 변환
-    md_all_list = []
-    for file_path in file_paths:
-        md_all = parse_workbook_all_sheets_to_markdown(
-            file_path,
-            max_total_chars=300_000,
-            max_rows_per_sheet=2000,
-            save_combined_markdown=False,
-        )
-        md_all_list.append(md_all)
+    md_all_list = [_markdown_for(file_path) for file_path in file_paths]
 
     # 배치 메시지 구성: [report_0, json_0, report_1, json_1, ...]
     messages = []
@@ -43,46 +46,99 @@ def process_batch(file_paths: list, project_root: Path):
 
     # 결과 저장
     for i, file_path in enumerate(file_paths):
-        try:
-            resp_report = responses[i * 2]
-            resp_jsons = responses[i * 2 + 1]
-            md_all = md_all_list[i]
+        _save_result(file_path, md_all_list[i], responses[i * 2], responses[i * 2 + 1], project_root)
 
-            if isinstance(resp_report, Exception) or isinstance(resp_jsons, Exception):
-                err = resp_report if isinstance(resp_report, Exception) else resp_jsons
-                print(f"!!! API 오류 ({file_path.name}): {type(err).__name__}: {err} !!!")
-                continue
 
-            report_text = resp_report.choices[0].message.content
-            json_text = resp_jsons.choices[0].message.content
+def _save_result(file_path: Path, md_all: str, resp_report, resp_jsons, project_root: Path):
+    """report/JSON 응답 한 쌍을 검증한 뒤 data/ 하위에 저장합니다."""
+    try:
+        if isinstance(resp_report, Exception) or isinstance(resp_jsons, Exception):
+            err = resp_report if isinstance(resp_report, Exception) else resp_jsons
+            print(f"!!! API 오류 ({file_path.name}): {type(err).__name__}: {err} !!!")
+            return
 
-            data = parse_json_and_schema(json_text)
-            report = replace_original_table_in_report(report_text, md_all)
+        report_text = resp_report.choices[0].message.content
+        json_text = resp_jsons.choices[0].message.content
 
-            output_file_stem = file_path.stem
+        data = parse_json_and_schema(json_text)
+        report = replace_original_table_in_report(report_text, md_all)
+
+        output_file_stem = file_path.stem
+
+        # JSON이 스키마에 맞는지 검증
+        try:
+            jsonschema.validate(instance=data["json_obj"], schema=data["json_schema"])
+        except (jsonschema.ValidationError, jsonschema.SchemaError) as e:
+            print(f"!!! 스키마 불일치 ({file_path.name}): {str(e)[:200]} !!!")
+            return
 
-            # JSON이 스키마에 맞는지 검증
-            try:
-                jsonschema.validate(instance=data["json_obj"], schema=data["json_schema"])
-            except (jsonschema.ValidationError, jsonschema.SchemaError) as e:
-                print(f"!!! 스키마 불일치 ({file_path.name}): {str(e)[:200]} !!!")
-                continue
+        p_report = project_root / "data" / "report" / f"{output_file_stem}.txt"
+        p_report.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(p_report, report.replace("\r\n", "\n"))
 
-            p_report = project_root / "data" / "report" / f"{output_file_stem}.txt"
-            p_report.parent.mkdir(parents=True, exist_ok=True)
-            p_report.write_text(report.replace("\r\n", "\n"), encoding="utf-8")
+        p_json = project_root / "data" / "json" / f"{output_file_stem}.json"
+        p_json.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(p_json, json.dumps(data["json_obj"], ensure_ascii=False, indent=2))
 
-            p_json = project_root / "data" / "json" / f"{output_file_stem}.json"
-            p_json.parent.mkdir(parents=True, exist_ok=True)
-            p_json.write_text(json.dumps(data["json_obj"], ensure_ascii=False, indent=2), encoding="utf-8")
+        p_schema = project_root / "data" / "json_schema" / f"{output_file_stem}.json"
+        p_schema.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(p_schema, json.dumps(data["json_schema"], ensure_ascii=False, indent=2))
 
-            p_schema = project_root / "data" / "json_schema" / f"{output_file_stem}.json"
-            p_schema.parent.mkdir(parents=True, exist_ok=True)
-            p_schema.write_text(json.dumps(data["json_schema"], ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"--- 처리 완료: {file_path.name} ---")
+    except Exception as e:
+        print(f"!!! 파일 오류 ({file_path.name}): {e} !!!")
 
-            print(f"--- 처리 완료: {file_path.name} ---")
+
+async def _acompletion_with_retry(messages: list, max_retries: int = 5):
+    """429(RateLimit) 응답 시 지수 백오프로 재시도하는 비동기 completion 호출."""
+    for attempt in range(max_retries + 1):
+        try:
+            return await litellm.acompletion(model=MODEL, messages=messages)
+        except litellm.RateLimitError:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(2 ** attempt)
+
+
+async def process_file_async(
+    file_path: Path,
+    project_root: Path,
+    sem: asyncio.Semaphore,
+    json_generator_prompts: str,
+    report_generator_prompts: str,
+):
+    """
+    파일 하나의 마크다운 변환 → report/JSON 생성 → 저장을 비동기로 수행합니다.
+    sem으로 동시에 처리 중인 파일 수(= 진행 중인 API 호출 수의 절반)를 제한합니다.
+    """
+    async with sem:
+        try:
+            md_all = await asyncio.to_thread(_markdown_for, file_path)
         except Exception as e:
             print(f"!!! 파일 오류 ({file_path.name}): {e} !!!")
+            return
+
+        report_prompt = report_generator_prompts + f'''=======INPUT MARKDOWN======{md_all}'''
+        json_prompt = json_generator_prompts + f'''=======INPUT MARKDOWN======{md_all}'''
+
+        resp_report, resp_jsons = await asyncio.gather(
+            _acompletion_with_retry([{"role": "user", "content": report_prompt}]),
+            _acompletion_with_retry([{"role": "user", "content": json_prompt}]),
+            return_exceptions=True,
+        )
+        _save_result(file_path, md_all, resp_report, resp_jsons, project_root)
+
+
+async def process_files_async(file_paths: list, project_root: Path, concurrency: int = 5):
+    """모든 파일을 동시에 처리하되, 동시에 처리 중인 파일 수는 concurrency로 제한합니다."""
+    json_generator_prompts = load_json_generator_prompts()
+    report_generator_prompts = load_report_generator_prompts()
+    sem = asyncio.Semaphore(concurrency)
+
+    await asyncio.gather(*[
+        process_file_async(p, project_root, sem, json_generator_prompts, report_generator_prompts)
+        for p in file_paths
+    ])
 
 
 if __name__ == "__main__":
@@ -92,7 +148,7 @@ if __name__ == "__main__":
     # import litellm
     # litellm._turn_on_debug()
 
-    BATCH_SIZE = 5
+    CONCURRENCY = 5  # 동시에 처리할 파일 수 (파일당 API 호출 2개, 계정 QPS 한도에 맞게 조정)
 
     # 프로젝트 루트 디렉토리 설정 (notebooks 폴더에서 실행해도 동일하게 동작)
     PROJECT_ROOT = Path.cwd()
@@ -125,12 +181,4 @@ if __name__ == "__main__":
 
     print(f"총 {len(excel_files)}개의 파일을 처리합니다.")
 
-    for batch_start in range(0, len(excel_files), BATCH_SIZE):
-        batch = excel_files[batch_start:batch_start + BATCH_SIZE]
-        print(f"\n=== 배치 처리 시작: {[f.name for f in batch]} ===")
-        try:
-            process_batch(batch, PROJECT_ROOT)
-        except Exception as e:
-            print(f"!!! 배치 오류 발생: {e} !!!")
-            for file_path in batch:
-                print(f"  - {file_path.name}")
\ No newline at end of file
+    asyncio.run(process_files_async(excel_files, PROJECT_ROOT, concurrency=CONCURRENCY))
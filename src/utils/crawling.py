@@ -1,41 +1,76 @@
-import os, re, time
+import asyncio
+import hashlib
+import json
+import os
+
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
+from selectolax.parser import HTMLParser
 from urllib.parse import urljoin
 from tqdm import tqdm
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
 
 BASE = "https://www.data.go.kr"
 OUT = "downloads_google"
+CACHE_DIR = os.path.join(OUT, ".cache")  # 상세 페이지별 ETag/Last-Modified + 결과 캐시
 os.makedirs(OUT, exist_ok=True)
 
 UA = {"User-Agent": "Mozilla/5.0"}
 
+LIST_CONCURRENCY = 8
+LIST_DELAY = 0.2  # 동시 요청 슬롯마다 두는 간격 (서버 부하 방지)
+DETAIL_WORKERS = 4  # 상세 페이지를 동시에 처리할 브라우저 컨텍스트 수
+DETAIL_DELAY = 1.2  # 컨텍스트마다 상세 페이지 사이에 두는 간격
+
+
+def _parse_detail_links(html: str) -> list[str]:
+    tree = HTMLParser(html)
+    urls = []
+    for a in tree.css("a[href*='/data/'][href$='/fileData.do']"):
+        href = a.attributes.get("href")
+        if href:
+            urls.append(urljoin(BASE, href))
+    return urls
+
+
+async def _fetch(session: aiohttp.ClientSession, sem: asyncio.Semaphore, url: str) -> list[str]:
+    async with sem:
+        async with session.get(url) as resp:
+            html = await resp.text()
+        # 같은 호스트에 대한 요청 간격은 세마포어 슬롯 안에서 유지
+        await asyncio.sleep(LIST_DELAY)
+    return await asyncio.to_thread(_parse_detail_links, html)
+
+
+async def _list_async(keyword: str, pages: int, per_page: int) -> list[str]:
+    urls = [
+        f"{BASE}/tcs/dss/selectDataSetList.do"
+        f"?dType=FILE&extsn=XLSX&keyword={requests.utils.quote(keyword)}"
+        f"&currentPage={p}&perPage={per_page}"
+        for p in range(1, pages + 1)
+    ]
+    sem = asyncio.Semaphore(LIST_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=LIST_CONCURRENCY, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(connector=connector, headers=UA, timeout=timeout) as session:
+        results = await asyncio.gather(*[_fetch(session, sem, u) for u in urls])
+    # 중복 제거하되 목록 페이지 순서(크롤링 순서)는 유지
+    return list(dict.fromkeys(u for page_urls in results for u in page_urls))
+
+
 def list_detail_urls(keyword: str, pages: int = 3, per_page: int = 100):
     """
     FILE 데이터 중 'XLSX' 확장자 포함 항목만 목록에서 수집
+    (목록 페이지는 aiohttp로 동시에 요청)
     """
-    urls = []
-    for p in range(1, pages + 1):
-        list_url = (
-            f"{BASE}/tcs/dss/selectDataSetList.do"
-            f"?dType=FILE&extsn=XLSX&keyword={requests.utils.quote(keyword)}"
-            f"&currentPage={p}&perPage={per_page}"
-        )
-        html = requests.get(list_url, headers=UA, timeout=30).text
-        soup = BeautifulSoup(html, "html.parser")
-
-        for a in soup.select("a[href*='/data/'][href$='/fileData.do']"):
-            href = a.get("href")
-            if href:
-                urls.append(urljoin(BASE, href))
-
-        time.sleep(0.8)
+    return asyncio.run(_list_async(keyword, pages, per_page))
 
-    return sorted(set(urls))
+def _url_tag(detail_url: str) -> str:
+    """상세 페이지 URL별 짧은 고유 태그 (저장 파일명 접두어)"""
+    return hashlib.sha1(detail_url.encode("utf-8")).hexdigest()[:10]
 
-def download_from_detail(page, detail_url: str):
-    page.goto(detail_url, wait_until="networkidle")
+async def download_from_detail(page, detail_url: str):
+    await page.goto(detail_url, wait_until="networkidle")
 
     # "기관자체에서 다운로드(제공데이터URL기재)"면 버튼이 '바로가기'로 뜨는 경우가 있음 :contentReference[oaicite:2]{index=2}
     # 그래서 1) 다운로드 시도 → 2) 실패하면 '바로가기' 클릭/URL 추출 로직으로 분기
@@ -43,30 +78,32 @@ def download_from_detail(page, detail_url: str):
 
     for label in candidates:
         loc = page.get_by_role("link", name=label)
-        if loc.count() == 0:
+        count = await loc.count()
+        if count == 0:
             continue
 
         # 같은 텍스트가 여러 개일 수 있어서(예: 컬럼정보 다운로드도 있음) 첫 시도는 앞에서부터
-        for i in range(min(loc.count(), 3)):
+        for i in range(min(count, 3)):
             target = loc.nth(i)
             try:
-                with page.expect_download(timeout=8000) as d:
-                    target.click()
-                download = d.value
+                async with page.expect_download(timeout=8000) as d:
+                    await target.click()
+                download = await d.value
                 suggested = download.suggested_filename or "file.xlsx"
                 if suggested.lower().endswith(".csv"):
-                    download.cancel()
+                    await download.cancel()
                     break
-                save_path = os.path.join(OUT, suggested)
-                download.save_as(save_path)
+                # 여러 컨텍스트가 동시에 저장하므로, 같은 제안 파일명("file.xlsx" 등)이 겹치지 않게 URL 태그를 붙임
+                save_path = os.path.join(OUT, f"{_url_tag(detail_url)}_{suggested}")
+                await download.save_as(save_path)
                 return ("downloaded", save_path)
             except Exception:
                 # 다운로드가 아니고 새 페이지로 이동하는 형태일 수 있음(바로가기)
                 # 클릭 후 URL 변화가 있으면 그 URL을 반환
                 before = page.url
                 try:
-                    target.click()
-                    page.wait_for_timeout(1000)
+                    await target.click()
+                    await page.wait_for_timeout(1000)
                 except Exception:
                     pass
                 after = page.url
@@ -75,20 +112,104 @@ def download_from_detail(page, detail_url: str):
 
     return ("failed", detail_url)
 
-def main(keyword: str, pages: int = 2):
-    detail_urls = list_detail_urls(keyword, pages=pages)
+def _cache_path(detail_url: str) -> str:
+    return os.path.join(CACHE_DIR, hashlib.sha1(detail_url.encode("utf-8")).hexdigest() + ".json")
+
+def _load_cache(detail_url: str) -> dict | None:
+    try:
+        with open(_cache_path(detail_url), encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # 다운로드 결과는 이 URL의 태그가 붙은 파일이 아직 남아 있을 때만 재사용
+    # (태그 없는 이전 캐시는 다른 URL과 같은 경로를 가리켰을 수 있으므로 버림)
+    if entry.get("status") == "downloaded":
+        saved_path = entry.get("saved_path", "")
+        if not os.path.basename(saved_path).startswith(_url_tag(detail_url) + "_"):
+            return None
+        if not os.path.exists(saved_path):
+            return None
+    return entry
+
+def _save_cache(detail_url: str, validators: dict, status: str, info: str) -> None:
+    if status == "failed" or not validators:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    entry = {**validators, "status": status, "saved_path": info}
+    with open(_cache_path(detail_url), "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+
+async def _revalidate(session: aiohttp.ClientSession, detail_url: str, cached: dict | None):
+    """
+    조건부 HEAD 요청. (변경 없음 여부, 새 ETag/Last-Modified) 를 반환
+    서버가 캐시 헤더를 주지 않으면 항상 변경된 것으로 간주
+    """
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        async with session.head(detail_url, headers=headers, allow_redirects=True) as resp:
+            validators = {}
+            if resp.headers.get("ETag"):
+                validators["etag"] = resp.headers["ETag"]
+            if resp.headers.get("Last-Modified"):
+                validators["last_modified"] = resp.headers["Last-Modified"]
+            return resp.status == 304 and bool(headers), validators
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        # 타임아웃/연결 오류는 변경된 것으로 간주하고 다시 받음
+        return False, {}
+
+async def _detail_worker(browser, session: aiohttp.ClientSession, queue: asyncio.Queue, pbar: tqdm):
+    """브라우저 컨텍스트 하나를 소유하고 큐에서 상세 페이지 URL을 꺼내 처리"""
+    context = await browser.new_context(accept_downloads=True)
+    page = await context.new_page()
+    try:
+        while True:
+            try:
+                u = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            validators: dict = {}
+            try:
+                cached = _load_cache(u)
+                not_modified, validators = await _revalidate(session, u, cached)
+                if not_modified:
+                    # 304: 브라우저 렌더링 없이 이전 결과 재사용
+                    print(cached["status"], cached["saved_path"], "(cached)")
+                    pbar.update(1)
+                    continue
+
+                status, info = await download_from_detail(page, u)
+            except Exception as e:
+                status, info = "failed", f"{u} ({e})"
+            _save_cache(u, validators, status, info)
+            print(status, info)
+            pbar.update(1)
+            await asyncio.sleep(DETAIL_DELAY)  # 컨텍스트별 요청 간격
+    finally:
+        await context.close()
+
+async def _main_async(keyword: str, pages: int, workers: int):
+    detail_urls = await _list_async(keyword, pages, 100)
     print("detail pages:", len(detail_urls))
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+    queue: asyncio.Queue = asyncio.Queue()
+    for u in detail_urls:
+        queue.put_nowait(u)
 
-        for u in tqdm(detail_urls):
-            status, info = download_from_detail(page, u)
-            print(status, info)
-            time.sleep(1.2)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(headers=UA, timeout=timeout) as session, async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        with tqdm(total=len(detail_urls)) as pbar:
+            await asyncio.gather(*[_detail_worker(browser, session, queue, pbar) for _ in range(workers)])
+        await browser.close()
 
-        browser.close()
+def main(keyword: str, pages: int = 2, workers: int = DETAIL_WORKERS):
+    asyncio.run(_main_async(keyword, pages, workers))
 
 
 if __name__ == "__main__":
@@ -1,7 +1,13 @@
 import os
+import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import serpapi
 
 # 1. 설정
@@ -9,17 +15,86 @@ load_dotenv()
 SEARCH_QUERY = "문서 filetype:xlsx"
 SAVE_DIR = "downloads_google_2"
 TOTAL_PAGES = 10  # 가져올 페이지 수 (페이지당 100개)
+MAX_WORKERS = 16  # 동시 다운로드 수
+SERPAPI_QPS = 1.0  # SerpAPI 요금제 허용 QPS (검색 호출에만 적용)
 
 if not os.path.exists(SAVE_DIR):
     os.makedirs(SAVE_DIR)
 
+# keep-alive 커넥션 풀을 재사용하는 공용 세션 (매 요청마다 TCP/TLS 핸드셰이크 방지)
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+    ),
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+
+class TokenBucket:
+    """
+    초당 rate개의 토큰을 채우는 단순 토큰 버킷.
+    acquire()는 토큰이 생길 때까지 대기합니다.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.rate)
+                self.updated = time.monotonic()
+                self.tokens = 0
+            else:
+                self.tokens -= 1
+
+
+def fetch(url: str, path: str) -> str:
+    """
+    url을 path에 1 MiB 단위로 스트리밍 저장합니다 (응답 전체를 메모리에 올리지 않음).
+    path.part에 받은 뒤 완료되면 os.replace로 옮기므로, 중간에 끊겨도 잘린 .xlsx가 남지 않습니다.
+    """
+    part = path + ".part"
+    try:
+        with SESSION.get(url, stream=True, timeout=(5, 30)) as resp:
+            resp.raise_for_status()
+            resp.raw.decode_content = True  # gzip/deflate 전송 인코딩 해제
+            with open(part, "wb", buffering=1 << 20) as f:
+                shutil.copyfileobj(resp.raw, f, length=1 << 20)
+        os.replace(part, path)
+    except BaseException:
+        try:
+            os.unlink(part)
+        except FileNotFoundError:
+            pass
+        raise
+    return path
+
+
 client = serpapi.Client()
+bucket = TokenBucket(SERPAPI_QPS)
 
-# 2. 페이지 반복 루프
+# 2. 페이지 반복 루프 — 다운로드 대상 (file_url, file_path) 수집
+jobs: list[tuple[str, str]] = []
+seen_paths: set[str] = set()  # 같은 제목끼리 같은 파일에 동시에 쓰지 않도록
 for page in range(TOTAL_PAGES):
     start_index = page * 30
     print(f"\n--- {page + 1}페이지 검색 중 (시작 인덱스: {start_index}) ---")
-    
+
+    bucket.acquire()
     results = client.search(
         q=SEARCH_QUERY,
         engine="google",
@@ -29,34 +104,38 @@ for page in range(TOTAL_PAGES):
         num=20,
         start=start_index  # 페이지 시작 위치 지정
     )
-    
+
     organic_results = results.get("organic_results", [])
-    
+
     # 더 이상 검색 결과가 없으면 종료
     if not organic_results:
         print("더 이상의 검색 결과가 없습니다.")
         break
 
-    # 3. 각 페이지의 결과 다운로드
     for idx, result in enumerate(organic_results):
         file_url = result.get("link")
+        if not file_url:
+            continue
         title = result.get("title", f"p{page}_file_{idx}")
-        
-        # 파일명 정제 및 저장
+
+        # 파일명 정제
         clean_title = "".join(c for c in title if c.isalnum() or c in (' ', '.', '_')).strip()
-        file_name = f"{clean_title}.xlsx"
-        file_path = os.path.join(SAVE_DIR, file_name)
-        
+        file_path = os.path.join(SAVE_DIR, f"{clean_title}.xlsx")
+        if file_path in seen_paths:
+            file_path = os.path.join(SAVE_DIR, f"{clean_title}_p{page}_{idx}.xlsx")
+        seen_paths.add(file_path)
+        jobs.append((file_url, file_path))
+
+# 3. 수집된 결과를 스레드 풀로 병렬 다운로드
+print(f"\n총 {len(jobs)}개의 파일을 다운로드합니다.")
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+    futures = {ex.submit(fetch, url, path): (url, path) for url, path in jobs}
+    for fut in as_completed(futures):
+        url, path = futures[fut]
         try:
-            # 서버 부하 방지를 위한 미세한 지연 (선택 사항)
-            time.sleep(0.5) 
-            
-            response = requests.get(file_url, timeout=15)
-            if response.status_code == 200:
-                with open(file_path, "wb") as f:
-                    f.write(response.content)
-                print(f"   [성공] {file_name}")
+            fut.result()
+            print(f"   [성공] {os.path.basename(path)}")
         except Exception as e:
-            print(f"   [오류] {file_url}: {e}")
+            print(f"   [오류] {url}: {e}")
 
 print("\n모든 페이지 수집 및 다운로드가 완료되었습니다.")
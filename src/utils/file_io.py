@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def write_text_atomic(path: str | os.PathLike, text: str, *, encoding: str = "utf-8") -> None:
+    """
+    Write `text` to `path` atomically.
+
+    The text is encoded once and written as bytes to a sibling temp file (no
+    text-layer buffering or newline translation), then moved into place with
+    os.replace, so readers never see a half-written file.
+    """
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(text.encode(encoding))
+    os.replace(tmp, path)
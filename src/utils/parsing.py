@@ -1,29 +1,94 @@
 from __future__ import annotations
 
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Iterable, Optional
 
 import pandas as pd
 
+from .file_io import write_text_atomic
+
+try:
+    from python_calamine import CalamineError
+    # calamine missing -> ImportError from pandas; calamine can't read the file -> CalamineError
+    _CALAMINE_FALLBACK_ERRORS: tuple[type[Exception], ...] = (ImportError, CalamineError)
+except ImportError:
+    _CALAMINE_FALLBACK_ERRORS = (ImportError,)
+
 
 SUPPORTED_EXCEL_EXTS = {".xlsx", ".xls", ".xlsm", ".xlsb"}
 SUPPORTED_CSV_EXTS = {".csv"}
 
 
+def _read_excel(path: Path, **kwargs) -> pd.DataFrame | dict[str, pd.DataFrame]:
+    """
+    pd.read_excel using the Rust-backed calamine engine, falling back to
+    pandas' default engine (openpyxl/xlrd) if calamine is unavailable or can't
+    read the file. Other errors (missing sheet, bad usecols, ...) propagate.
+    """
+    try:
+        return pd.read_excel(path, engine="calamine", **kwargs)
+    except _CALAMINE_FALLBACK_ERRORS:
+        return pd.read_excel(path, engine=None, **kwargs)
+
+
+def _open_excel_file(path: Path) -> pd.ExcelFile:
+    """
+    Open a workbook once (calamine if available) so multiple sheets can be read
+    without re-parsing the zip container, shared strings and styles each time.
+    """
+    try:
+        return pd.ExcelFile(path, engine="calamine")
+    except _CALAMINE_FALLBACK_ERRORS:
+        return pd.ExcelFile(path)
+
+
+def _cell_to_str(v) -> str:
+    if isinstance(v, float):
+        # Integral floats print like ints ("2024", not "2024.0") only while exactly
+        # representable; anything else keeps repr (1e+300, not a 301-digit string)
+        if v.is_integer() and abs(v) < 2**53:
+            return str(int(v))
+        return repr(float(v))
+    # Keep multi-line cells on a single markdown row
+    return str(v).replace("\n", " ")
+
+
 def _df_to_llm_markdown(df: pd.DataFrame, *, max_rows: int | None = None) -> str:
     """
     Convert DataFrame to a markdown table string suitable for LLM input.
     Optionally truncate rows to avoid huge prompts.
+
+    Cells are stringified column by column (NaN -> empty, integral floats without
+    the trailing ".0", as tabulate printed them) and each row is joined in C via
+    str.join, instead of going through tabulate per cell.
     """
     if max_rows is not None and len(df) > max_rows:
-        df = df.head(max_rows).copy()
+        df = df.head(max_rows)
 
-    # Column name cleanup (optional but helps)
-    df.columns = [str(c).strip().replace("\n", " ") for c in df.columns]
+    # Column name cleanup (optional but helps); only the header uses these,
+    # so the frame itself is neither copied nor mutated.
+    columns = [str(c).strip().replace("\n", " ") for c in df.columns]
 
-    # Convert to markdown table
-    return df.to_markdown(index=False)
+    if not columns:
+        return ""
+
+    # Per-column object lists keep each cell its own size (a fixed-width numpy
+    # string array would pad every cell to the longest one)
+    cells = [
+        [
+            "" if missing else _cell_to_str(v)
+            for v, missing in zip(col.to_numpy(dtype=object), col.isna().to_numpy())
+        ]
+        for _, col in df.items()
+    ]
+
+    header = "| " + " | ".join(columns) + " |"
+    separator = "|" + "|".join("---" for _ in columns) + "|"
+    body = ["| " + " | ".join(row) + " |" for row in zip(*cells)]
+
+    return "\n".join([header, separator, *body])
 
 
 def parse_raw_data(
@@ -34,6 +99,7 @@ def parse_raw_data(
     csv_sep: str | None = None,  # None => pandas tries to infer if engine="python" + sep=None (see code)
     # Excel options
     sheet_name: int | str | None = 0,  # default first sheet
+    excel_file: pd.ExcelFile | None = None,  # already-opened workbook to read from
     # Common options
     usecols: str | list[str] | None = None,
     skiprows: int | list[int] | None = None,
@@ -48,6 +114,7 @@ def parse_raw_data(
     Parse CSV or Excel into a DataFrame, then convert to LLM-input-friendly markdown.
 
     - Chooses parsing method by file extension.
+    - For Excel, reads from `excel_file` when given instead of re-opening `input_path`.
     - Optionally saves the produced markdown to a given path for verification.
 
     Returns:
@@ -76,15 +143,17 @@ def parse_raw_data(
             df = pd.read_csv(path, sep=csv_sep, **read_kwargs)
 
     elif ext in SUPPORTED_EXCEL_EXTS:
-        df = pd.read_excel(
-            path,
+        read_kwargs = dict(
             sheet_name=sheet_name,
             usecols=usecols,
             skiprows=skiprows,
             nrows=nrows,
             dtype=dtype,
-            engine=None,  # let pandas decide (usually openpyxl for xlsx)
         )
+        if excel_file is not None:
+            df = pd.read_excel(excel_file, **read_kwargs)
+        else:
+            df = _read_excel(path, **read_kwargs)
         # If sheet_name=None, pandas returns dict of DataFrames; handle that case.
         if isinstance(df, dict):
             # Concatenate sheets with a sheet indicator column
@@ -102,8 +171,12 @@ def parse_raw_data(
         )
 
     # --- Basic normalization (optional but practical) ---
-    # Drop fully empty rows/cols to reduce noise
-    df = df.dropna(axis=0, how="all").dropna(axis=1, how="all")
+    # Drop fully empty rows/cols to reduce noise (one notna pass, copy only if needed)
+    mask = df.notna().to_numpy()
+    row_keep = mask.any(axis=1)
+    col_keep = mask.any(axis=0)
+    if not row_keep.all() or not col_keep.all():
+        df = df.iloc[row_keep, col_keep]
 
     # --- Convert to markdown ---
     markdown_table = _df_to_llm_markdown(df, max_rows=max_rows_for_markdown)
@@ -117,7 +190,7 @@ def parse_raw_data(
         md_path = Path(intermediate_markdown_path)
         md_path.parent.mkdir(parents=True, exist_ok=True)
 
-        md_path.write_text(markdown_table, encoding="utf-8")
+        write_text_atomic(md_path, markdown_table)
 
     return markdown_table
 
@@ -157,8 +230,8 @@ def parse_workbook_all_sheets_to_markdown(
             f"Got extension={ext}. If you need CSV, call parse_raw_data() directly."
         )
 
-    # Get sheet names efficiently without loading everything
-    xls = pd.ExcelFile(path)
+    # Open the workbook once; every sheet below is read from this handle
+    xls = _open_excel_file(path)
     sheet_names = list(xls.sheet_names)
 
     # Apply include/exclude filters
@@ -172,37 +245,53 @@ def parse_workbook_all_sheets_to_markdown(
     parts: list[str] = []
     total_len = 0
 
-    for sheet in sheet_names:
-        # Parse this sheet to markdown (no intermediate save per-sheet here)
-        sheet_md = parse_raw_data(
-            path,
-            sheet_name=sheet,
-            usecols=usecols,
-            skiprows=skiprows,
-            nrows=nrows,
-            dtype=dtype,
-            max_rows_for_markdown=max_rows_per_sheet,
-            save_intermediate_markdown=False,
-        )
-
-        # Add a clear delimiter/header per sheet
-        block = f"\n\n## Sheet: {sheet}\n\n{sheet_md}\n"
-
-        # Stop before exceeding max_total_chars
-        if total_len + len(block) > max_total_chars:
-            # Optional: add a truncation note if there is still space
-            note = (
-                f"\n\n---\n"
-                f"*Stopped concatenation before adding sheet '{sheet}' "
-                f"because it would exceed max_total_chars={max_total_chars}.*\n"
-            )
-            if total_len + len(note) <= max_total_chars:
-                parts.append(note)
-                total_len += len(note)
-            break
-
-        parts.append(block)
-        total_len += len(block)
+    with xls:
+        for sheet in sheet_names:
+            remaining = max_total_chars - total_len
+            head = f"\n\n## Sheet: {sheet}\n\n"
+
+            # Even an empty table would not fit: stop without parsing the sheet
+            if len(head) + 1 > remaining:
+                block = None
+            else:
+                # Each markdown body row costs at least 5 chars ("|  |\n"), so rows
+                # beyond remaining // 5 can never fit; capping them skips formatting
+                # work without changing which sheets fit.
+                row_cap = remaining // 5 + 1
+                if max_rows_per_sheet is not None:
+                    row_cap = min(row_cap, max_rows_per_sheet)
+
+                # Parse this sheet to markdown (no intermediate save per-sheet here)
+                sheet_md = parse_raw_data(
+                    path,
+                    sheet_name=sheet,
+                    excel_file=xls,
+                    usecols=usecols,
+                    skiprows=skiprows,
+                    nrows=nrows,
+                    dtype=dtype,
+                    max_rows_for_markdown=row_cap,
+                    save_intermediate_markdown=False,
+                )
+
+                # Add a clear delimiter/header per sheet
+                block = f"{head}{sheet_md}\n"
+
+            # Stop before exceeding max_total_chars
+            if block is None or total_len + len(block) > max_total_chars:
+                # Optional: add a truncation note if there is still space
+                note = (
+                    f"\n\n---\n"
+                    f"*Stopped concatenation before adding sheet '{sheet}' "
+                    f"because it would exceed max_total_chars={max_total_chars}.*\n"
+                )
+                if total_len + len(note) <= max_total_chars:
+                    parts.append(note)
+                    total_len += len(note)
+                break
+
+            parts.append(block)
+            total_len += len(block)
 
     combined = "".join(parts).lstrip()
 
@@ -213,6 +302,49 @@ def parse_workbook_all_sheets_to_markdown(
 
         md_path = Path(combined_markdown_path)
         md_path.parent.mkdir(parents=True, exist_ok=True)
-        md_path.write_text(combined, encoding="utf-8")
+        write_text_atomic(md_path, combined)
 
     return combined
+
+
+def _parse_one(path: Path) -> tuple[Path, str | None]:
+    """Worker for parse_directory: returns (path, error message or None)."""
+    try:
+        parse_workbook_all_sheets_to_markdown(path, save_combined_markdown=True)
+        return path, None
+    except Exception as e:
+        return path, f"{type(e).__name__}: {e}"
+
+
+def parse_directory(
+    root: str | os.PathLike,
+    *,
+    recursive: bool = False,
+    max_workers: int | None = None,
+    chunksize: int = 4,
+) -> list[Path]:
+    """
+    Run parse_workbook_all_sheets_to_markdown(save_combined_markdown=True) over every
+    Excel workbook under `root`, fanned out across processes (one per CPU by default).
+
+    Returns:
+        paths of workbooks that were parsed successfully
+    """
+    root = Path(root)
+    if not root.is_dir():
+        raise NotADirectoryError(f"Not a directory: {root}")
+
+    pattern = "**/*" if recursive else "*"
+    paths = sorted(
+        p for p in root.glob(pattern)
+        if p.suffix.lower() in SUPPORTED_EXCEL_EXTS and p.is_file() and not p.name.startswith("~$")
+    )
+
+    done: list[Path] = []
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as ex:
+        for path, err in ex.map(_parse_one, paths, chunksize=chunksize):
+            if err is None:
+                done.append(path)
+            else:
+                print(f"[skip] {path.name}: {err}")
+    return done
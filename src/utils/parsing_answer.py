@@ -4,6 +4,12 @@ import json
 import re
 from typing import TypedDict, Any
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 class ParsedDoc(TypedDict):
     json_obj: Any          # dict | list
@@ -11,37 +17,90 @@ class ParsedDoc(TypedDict):
 
 
 _SECTION_PATTERNS = {
-    "report": r"===\s*REPORT\s*===",
-    "json": r"===\s*JSON\s*===",
-    "json_schema": r"===\s*JSON_SCHEMA\s*===",
+    "report": re.compile(r"===\s*REPORT\s*===", re.IGNORECASE),
+    "json": re.compile(r"===\s*JSON\s*===", re.IGNORECASE),
+    "json_schema": re.compile(r"===\s*JSON_SCHEMA\s*===", re.IGNORECASE),
 }
 
+_CRLF = re.compile(r"\r\n?")
+_JSON_FENCE = re.compile(r"```json\s*\n(.*?)\n```", re.IGNORECASE | re.DOTALL)
+_PLACEHOLDERS_RE = re.compile(r"<(original_table|json|json_schema)>")
+_JSON_OPEN = re.compile(r"[\[{]")
+_JSON_TOKEN = re.compile(r'[\[\]{}"\\]')
+_JSON_CLOSER = {"{": "}", "[": "]"}
+
 
 def _normalize_newlines(s: str) -> str:
-    return s.replace("\r\n", "\n").replace("\r", "\n")
+    # Common case (LLM output is already \n-only): no scan-and-copy at all
+    if "\r" not in s:
+        return s
+    return _CRLF.sub("\n", s)
 
 
-def _extract_between(text: str, start_pat: str, end_pat: str | None) -> str:
+def _extract_between(text: str, start_pat: re.Pattern, end_pat: re.Pattern | None) -> str:
     """
     Extract content between start marker and end marker (or end of text).
     """
-    start = re.search(start_pat, text, flags=re.IGNORECASE)
+    start = start_pat.search(text)
     if not start:
-        raise ValueError(f"Start section not found: {start_pat}")
+        raise ValueError(f"Start section not found: {start_pat.pattern}")
 
     start_idx = start.end()
 
     if end_pat is None:
         chunk = text[start_idx:]
     else:
-        end = re.search(end_pat, text[start_idx:], flags=re.IGNORECASE)
+        end = end_pat.search(text, start_idx)
         if not end:
-            raise ValueError(f"End section not found: {end_pat}")
-        chunk = text[start_idx : start_idx + end.start()]
+            raise ValueError(f"End section not found: {end_pat.pattern}")
+        chunk = text[start_idx : end.start()]
 
     return chunk.strip()
 
 
+def _find_json_span(s: str, pos: int = 0) -> tuple[int, int] | None:
+    """
+    Return (start, end) of the first top-level {...} or [...] span at or after `pos`.
+    Single linear pass over bracket/quote tokens; brackets inside JSON strings are ignored.
+    A span ends where its outermost bracket closes (or at a mismatched closer, so the
+    caller's parse fails on it); an unclosed outer bracket at EOF yields None.
+    """
+    opening = _JSON_OPEN.search(s, pos)
+    if opening is None:
+        return None
+
+    stack: list[str] = []  # expected closers
+    start = opening.start()
+    in_string = False
+    escaped_at = -1
+    for m in _JSON_TOKEN.finditer(s, start):
+        i = m.start()
+        c = m.group()
+        if in_string:
+            if i == escaped_at:
+                continue
+            if c == "\\":
+                escaped_at = i + 1
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in _JSON_CLOSER:
+            if not stack:
+                start = i
+            stack.append(_JSON_CLOSER[c])
+        elif c == "\\" or not stack:
+            # Stray backslash or closer outside any span
+            continue
+        elif stack[-1] == c:
+            stack.pop()
+            if not stack:
+                return start, i + 1
+        else:
+            return start, i + 1
+    return None
+
+
 def _extract_json_from_chunk(chunk: str) -> Any:
     """
     Accepts either:
@@ -50,23 +109,44 @@ def _extract_json_from_chunk(chunk: str) -> Any:
     Returns parsed JSON (dict or list).
     """
     # Prefer fenced ```json ... ```
-    m = re.search(r"```json\s*\n(.*?)\n```", chunk, flags=re.IGNORECASE | re.DOTALL)
+    m = _JSON_FENCE.search(chunk)
     if m:
-        json_text = m.group(1).strip()
-    else:
-        # Otherwise try to find first {...} or [...] block
-        m2 = re.search(r"(\{.*\}|\[.*\])\s*$", chunk.strip(), flags=re.DOTALL)
-        if not m2:
-            # fallback: try anywhere
-            m2 = re.search(r"(\{.*\}|\[.*\])", chunk, flags=re.DOTALL)
-        if not m2:
-            raise ValueError("JSON content not found in section.")
-        json_text = m2.group(1).strip()
+        return _loads(m.group(1).strip())
+
+    # Otherwise take the first top-level {...} or [...] block that parses;
+    # a span that fails is skipped whole, so the scan stays linear
+    error: ValueError | None = None
+    pos = 0
+    while (span := _find_json_span(chunk, pos)) is not None:
+        start, end = span
+        try:
+            return _loads(chunk[start:end])
+        except ValueError as e:
+            error = error or e
+            pos = end
+
+    if error is not None:
+        raise error
+    raise ValueError("JSON content not found in section.")
+
+
+def _loads(json_text: str) -> Any:
+    """
+    Parse JSON with orjson when available, falling back to the stdlib parser
+    for inputs orjson rejects but json accepts (e.g. NaN, >64-bit integers).
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(json_text.encode("utf-8"))
+        except orjson.JSONDecodeError:
+            pass
 
     try:
         return json.loads(json_text)
     except json.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON: {e}") from e
+    except RecursionError as e:
+        raise ValueError("Invalid JSON: nesting too deep") from e
 
 def parse_json_and_schema(text: str) -> ParsedDoc:
     """
@@ -108,9 +188,12 @@ def parse_json_and_schema(text: str) -> ParsedDoc:
     }
 
 
-def replace_original_table_in_report(text:str, parsed_md:str) -> str:
+def replace_original_table_in_report(text: str, parsed_md: str, **subs: str) -> str:
     """
-    보고서 텍스트의 '<original table>' 플레이스홀더를
+    보고서 텍스트의 '<original_table>' 플레이스홀더를
     제공된 마크다운 테이블(`parsed_md`)로 바꿉니다.
+    `json=...`, `json_schema=...` 를 넘기면 '<json>', '<json_schema>' 도
+    같은 한 번의 순회에서 함께 치환합니다. (값이 없는 플레이스홀더는 그대로 둠)
     """
-    return text.replace("<original_table>", parsed_md)
\ No newline at end of file
+    sub_map = {"original_table": parsed_md, **subs}
+    return _PLACEHOLDERS_RE.sub(lambda m: sub_map.get(m.group(1), m.group(0)), text)
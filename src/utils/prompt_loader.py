@@ -1,5 +1,6 @@
 # prompt_loader.py
 import random
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -18,14 +19,28 @@ def find_project_root(start: Path | None = None) -> Path:
 PROJECT_ROOT = find_project_root()
 PROMPT_DIR = PROJECT_ROOT / "prompt"
 
+
+@lru_cache(maxsize=64)
+def _read_cached(path_str: str, mtime_ns: int) -> str:
+    return Path(path_str).read_text(encoding="utf-8")
+
+
+def _read_prompt(name: str) -> str:
+    """
+    Read a prompt file from PROMPT_DIR, cached by (path, mtime).
+    Editing the file invalidates the cache entry on the next call.
+    """
+    p = PROMPT_DIR / name
+    return _read_cached(str(p), p.stat().st_mtime_ns)
+
 def load_json_generator_prompts():
     print(PROMPT_DIR)
-    system_prompt = (PROMPT_DIR / "json_SYSTEM_prompt.txt").read_text(encoding="utf-8")
+    system_prompt = _read_prompt("json_SYSTEM_prompt.txt")
 
     return system_prompt
 
 def load_report_generator_prompts(prompt_type: str = 'report'):
-    system_prompt = (PROMPT_DIR / "SYSTEM_prompt.txt").read_text(encoding="utf-8")
+    system_prompt = _read_prompt("SYSTEM_prompt.txt")
     # user_prompt_template = (PROMPT_DIR / "USER_prompt.txt").read_text(encoding="utf-8")
 
     # developer_prompt = list(PROMPT_DIR.glob(f"prompt_{prompt_type}.txt"))
@@ -1,8 +1,224 @@
 from __future__ import annotations
 
+import ctypes
+import errno
+import hashlib
+import mmap
+import operator
+import os
+import platform
 import re
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
+
+try:
+    import blake3
+    HAS_BLAKE3 = True
+except ImportError:
+    HAS_BLAKE3 = False
+
+# renameat2(2) with RENAME_NOREPLACE: atomic "rename unless target exists" (Linux >= 3.15)
+_AT_FDCWD = -100 if sys.platform.startswith("linux") else -2
+_RENAME_NOREPLACE = 1
+_SYS_RENAMEAT2 = {"x86_64": 316, "aarch64": 276}.get(platform.machine())
+# Renames are issued relative to an open directory fd where the platform allows it
+_USE_DIR_FD = os.rename in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+
+# CDLL(None) means "this process" only on POSIX; on Windows it raises TypeError
+_libc = None
+_HAS_RENAMEAT2 = False
+if os.name == "posix":
+    try:
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _libc.renameat.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p]
+        _libc.renameat.restype = ctypes.c_int
+        _HAS_RENAMEAT2 = (
+            sys.platform.startswith("linux") and _SYS_RENAMEAT2 is not None and hasattr(_libc, "syscall")
+        )
+    except (OSError, AttributeError):
+        _libc = None
+        _HAS_RENAMEAT2 = False
+
+
+def _lexists_at(dir_fd: int, name: str | bytes) -> bool:
+    try:
+        os.stat(name, dir_fd=None if dir_fd == _AT_FDCWD else dir_fd, follow_symlinks=False)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _rename_fast(src: bytes, dst: bytes, dir_fd: int = _AT_FDCWD) -> None:
+    """renameat(2) called straight through libc, skipping the os.rename wrapper."""
+    if _libc is None:
+        fd = None if dir_fd == _AT_FDCWD else dir_fd
+        os.rename(src, dst, src_dir_fd=fd, dst_dir_fd=fd)
+        return
+    if _libc.renameat(dir_fd, src, dir_fd, dst) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), os.fsdecode(src), None, os.fsdecode(dst))
+
+
+def _renameat2(
+    src: str | Path, dst: str | Path, flags: int = _RENAME_NOREPLACE, *, dir_fd: int = _AT_FDCWD
+) -> None:
+    """
+    Rename src -> dst (both relative to dir_fd), failing with FileExistsError if dst exists.
+    Uses the renameat2 syscall when available, otherwise an exists-check + renameat.
+    """
+    global _HAS_RENAMEAT2
+    src_b, dst_b = os.fsencode(src), os.fsencode(dst)
+    if _HAS_RENAMEAT2:
+        ret = _libc.syscall(_SYS_RENAMEAT2, dir_fd, src_b, dir_fd, dst_b, flags)
+        if ret == 0:
+            return
+        err = ctypes.get_errno()
+        if err not in (errno.ENOSYS, errno.EINVAL):
+            raise OSError(err, os.strerror(err), str(src), None, str(dst))
+        # Kernel or filesystem doesn't support renameat2 flags: stop trying
+        _HAS_RENAMEAT2 = False
+
+    if _lexists_at(dir_fd, dst_b):
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), str(src), None, str(dst))
+    _rename_fast(src_b, dst_b, dir_fd)
+
+
+def _rename_flat(dir_fd: int, pairs: list[tuple[str, str]]) -> None:
+    """
+    Sequential renameat2 loop for independent renames inside one directory,
+    with the syscall and its arguments pre-bound to locals.
+    """
+    i = 0
+    if _HAS_RENAMEAT2:
+        syscall, nr, flags, fsencode = _libc.syscall, _SYS_RENAMEAT2, _RENAME_NOREPLACE, os.fsencode
+        for i, (src, dst) in enumerate(pairs):
+            if syscall(nr, dir_fd, fsencode(src), dir_fd, fsencode(dst), flags) != 0:
+                break
+        else:
+            return
+    # No renameat2 (e.g. macOS), or a call failed: error reporting and the ENOSYS
+    # fallback live in _renameat2; finish the rest sequentially through it
+    for src, dst in pairs[i:]:
+        _renameat2(src, dst, dir_fd=dir_fd)
+
+
+def _rename_dir(parent: str, pairs: list[tuple[str, str]]) -> None:
+    """Rename (old_name, new_name) pairs inside one directory, sequentially."""
+    # Every planned target matches the {prefix}{n} pattern, and every candidate that
+    # matches it is collected into used_ids instead of being planned. So no target is
+    # another entry's source: each rename is independent and needs no ordering or temp.
+    assert {old for old, _ in pairs}.isdisjoint(new for _, new in pairs)
+    if not _USE_DIR_FD:
+        join = os.path.join
+        _rename_flat(_AT_FDCWD, [(join(parent, old), join(parent, new)) for old, new in pairs])
+        return
+    fd = os.open(parent, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        _rename_flat(fd, pairs)
+    finally:
+        os.close(fd)
+
+
+def _execute_plan(plan: list[tuple[str, str, str]]) -> None:
+    """
+    Execute (parent, old_name, new_name) renames grouped by directory, by name relative
+    to one open directory fd per group (renameat-style), so the kernel doesn't
+    re-walk the full path each time.
+
+    Renames inside one directory serialize on its inode lock, so each group runs
+    sequentially; only separate directories (recursive=True) go to a thread pool,
+    where the ctypes/os calls release the GIL and the per-directory work overlaps.
+    """
+    groups: dict[str, list[tuple[str, str]]] = {}
+    for parent, old, new in plan:
+        groups.setdefault(parent, []).append((old, new))
+
+    if len(groups) < 2:
+        for parent, pairs in groups.items():
+            _rename_dir(parent, pairs)
+        return
+    max_workers = min(32, (os.cpu_count() or 1) * 4, len(groups))
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        list(ex.map(_rename_dir, groups.keys(), groups.values()))
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def _natural_key(name: str) -> tuple:
+    """'data_2.xlsx' < 'data_10.xlsx': split into alternating (str, int, str, ...) parts."""
+    parts: list = _DIGITS.split(name.lower())
+    parts[1::2] = map(int, parts[1::2])
+    return tuple(parts)
+
+
+def _iter_xlsx(
+    d: str | Path, recursive: bool, exts: set[str], listing: dict[str, set[str]] | None = None
+) -> Iterator[os.DirEntry]:
+    """
+    Yield regular-file DirEntries under d whose name ends with one of exts,
+    skipping Excel lock files (~$...). Recursion uses an explicit stack.
+    If listing is given, every name seen is recorded there per scanned directory.
+    """
+    suffixes = tuple(exts)
+    stack = [os.fspath(d)]
+    while stack:
+        path = stack.pop()
+        names = listing.setdefault(path, set()) if listing is not None else None
+        with os.scandir(path) as it:
+            for entry in it:
+                if names is not None:
+                    names.add(entry.name)
+                if recursive and entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif (
+                    entry.name.endswith(suffixes)
+                    and not entry.name.startswith("~$")
+                    and entry.is_file(follow_symlinks=False)
+                ):
+                    yield entry
+
+
+def _content_digest(path: str) -> bytes:
+    """파일 내용 해시 (blake3, 없으면 hashlib.blake2b). mmap으로 읽어 사용자 공간 복사를 피함."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if HAS_BLAKE3:
+                return blake3.blake3(mm, max_threads=blake3.blake3.AUTO).digest()
+            return hashlib.blake2b(mm).digest()
+
+
+def _duplicate_paths(entries: list[os.DirEntry]) -> set[str]:
+    """
+    entries 순서상 앞선 파일과 내용이 같은 파일의 경로를 반환합니다.
+    크기로 먼저 묶고, 크기가 같은 파일이 둘 이상인 묶음만 해시합니다.
+    """
+    by_size: dict[int, list[str]] = {}
+    for e in entries:
+        by_size.setdefault(e.stat(follow_symlinks=False).st_size, []).append(e.path)
+    candidates = [p for paths in by_size.values() if len(paths) > 1 for p in paths]
+    if not candidates:
+        return set()
+
+    with ThreadPoolExecutor(max_workers=min(8, len(candidates))) as ex:
+        digests = dict(zip(candidates, ex.map(_content_digest, candidates)))
+
+    seen: set[tuple[int, bytes]] = set()
+    duplicates: set[str] = set()
+    for size, paths in by_size.items():
+        if len(paths) < 2:
+            continue
+        for p in paths:
+            key = (size, digests[p])
+            if key in seen:
+                duplicates.add(p)
+            else:
+                seen.add(key)
+    return duplicates
 
 
 def rename_xlsx_sequential(
@@ -12,47 +228,70 @@ def rename_xlsx_sequential(
     start: int = 1,
     recursive: bool = False,
     dry_run: bool = True,
-    sort_by: str = "name",  # "name" | "mtime"
+    sort_by: str = "name",  # "name" | "natural" | "mtime"
     extensions: Iterable[str] = (".xlsx",),
+    verbose: bool = True,
+    dedupe: bool = False,
 ) -> list[tuple[Path, Path]]:
     """
     이미 {prefix}{숫자}.xlsx 규칙에 맞는 파일은 건드리지 않고,
     규칙에 맞지 않는 파일만 기존 번호와 겹치지 않는 다음 번호로 rename합니다.
 
     Safety:
-      - Uses a 2-step rename via temporary filenames to avoid collisions.
+      - Every rename uses renameat2(RENAME_NOREPLACE), so an existing file is never overwritten.
+      - Targets always match the naming rule and sources never do, so each file is renamed once.
+      - dedupe=True: files whose content duplicates another candidate are left unrenamed
+        (the already-numbered copy, else the first in sort order, is kept).
       - Returns list of (old_path, new_path).
     """
-    d = Path(target_dir).resolve()
-    if not d.exists() or not d.is_dir():
+    # One stat() validates existence and type; abspath is pure string work (no symlink walk)
+    d = Path(os.path.abspath(target_dir))
+    try:
+        st = os.stat(d)
+    except FileNotFoundError:
+        raise NotADirectoryError(f"Not a directory: {d}") from None
+    if not stat.S_ISDIR(st.st_mode):
         raise NotADirectoryError(f"Not a directory: {d}")
 
     exts = {ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in extensions}
 
-    glob_prefix = "**/*" if recursive else "*"
-    files: list[Path] = []
-    for ext in exts:
-        files.extend(p for p in d.glob(f"{glob_prefix}{ext}") if p.is_file())
-
-    files = [p for p in files if not p.name.startswith("~$")]
-
+    # DirEntry.is_file() comes from readdir's d_type and DirEntry.stat() is cached,
+    # so gathering costs at most one stat per candidate (none when sorting by name).
+    # From here on files are plain (parent, name) strings; Path objects are only
+    # built for the returned plan.
+    listing: dict[str, set[str]] = {}  # 디렉터리별 전체 이름 (대상 충돌 검사용)
+    entries = list(_iter_xlsx(d, recursive, exts, listing))
     if sort_by == "mtime":
-        files.sort(key=lambda p: p.stat().st_mtime)
+        # 정수 st_mtime_ns로 비교 (float보다 싸고 정밀도 손실 없음), stat은 항목당 한 번
+        decorated = [(e.stat(follow_symlinks=False).st_mtime_ns, e.path, e.name) for e in entries]
+        decorated.sort(key=operator.itemgetter(0))
     else:
-        files.sort(key=lambda p: p.name.lower())
+        if sort_by == "natural":
+            decorated = [(_natural_key(e.name), e.path, e.name) for e in entries]
+        else:
+            decorated = [(e.name.lower(), e.path, e.name) for e in entries]
+        decorated.sort()
+    pattern = re.compile(rf"^{re.escape(prefix)}(\d+)$", re.IGNORECASE)
+
+    duplicates: set[str] = set()
+    if dedupe:
+        # 규칙에 맞는 파일을 앞에 두어, 내용이 같으면 이미 번호가 붙은 쪽을 남김
+        by_path = {e.path: e for e in entries}
+        ordered = sorted(
+            (by_path[path] for _, path, _ in decorated),
+            key=lambda e: pattern.match(os.path.splitext(e.name)[0]) is None,
+        )
+        duplicates = _duplicate_paths(ordered)
 
     # 이미 규칙에 맞는 파일의 번호를 수집
-    pattern = re.compile(rf"^{re.escape(prefix)}(\d+)$", re.IGNORECASE)
     used_ids: set[int] = set()
-    already_named: set[Path] = set()
-    for p in files:
-        m = pattern.match(p.stem)
+    to_rename: list[tuple[str, str]] = []  # 이상한 이름 파일들만 추림
+    for _, path, name in decorated:
+        m = pattern.match(os.path.splitext(name)[0])
         if m:
             used_ids.add(int(m.group(1)))
-            already_named.add(p)
-
-    # 이상한 이름 파일들만 추림
-    to_rename = [p for p in files if p not in already_named]
+        elif path not in duplicates:
+            to_rename.append((os.path.dirname(path), name))
 
     # 겹치지 않는 번호 순서대로 할당
     def next_id(current: int) -> int:
@@ -60,40 +299,61 @@ def rename_xlsx_sequential(
             current += 1
         return current
 
-    plan: list[tuple[Path, Path]] = []
+    ids: list[int] = []
     n = start
-    for p in to_rename:
+    for _ in to_rename:
         n = next_id(n)
-        new_name = f"{prefix}{n}.xlsx"
-        new_path = p.with_name(new_name)
-        plan.append((p, new_path))
-        used_ids.add(n)
+        ids.append(n)
         n += 1
 
+    names = [prefix + str(i) + ".xlsx" for i in ids]
+    plan: list[tuple[str, str, str]] = [
+        (parent, old, new) for (parent, old), new in zip(to_rename, names)
+    ]
+
+    join = os.path.join
+    result = [(Path(join(parent, old)), Path(join(parent, new))) for parent, old, new in plan]
+
+    if duplicates and verbose:
+        print(f"(내용이 중복된 {len(duplicates)}개 파일은 rename하지 않음)")
+
     if not plan:
-        print("rename할 파일이 없습니다. (모두 이미 규칙에 맞는 이름)")
-        return plan
+        if verbose:
+            print("rename할 파일이 없습니다. (모두 이미 규칙에 맞는 이름)")
+        return result
 
-    for old, new in plan:
-        print(f"{old.name}  ->  {new.name}")
+    if verbose:
+        # 한 번의 write로 출력 (파일 수만큼 print를 호출하지 않음)
+        sys.stdout.write("\n".join(f"{old}  ->  {new}" for _, old, new in plan) + "\n")
 
-    if dry_run:
-        print("\n[dry_run=True] No files were renamed.")
-        return plan
+    # rename 전에 충돌을 모두 보고하고 하나도 옮기지 않은 채 중단하기 위한 사전 검사.
+    # 대상은 계획의 old와 절대 겹치지 않으므로(후보가 아닌 파일: 다른 확장자, 디렉터리 등)
+    # 스캔한 디렉터리 목록과 비교만 하고 stat은 하지 않음. 스캔 이후 생긴 파일은
+    # RENAME_NOREPLACE가 FileExistsError로 막음.
+    existing_conflicts = sorted(
+        join(parent, new) for parent, _, new in plan if new in listing.get(parent, ())
+    )
+    if existing_conflicts and verbose:
+        sys.stdout.write(
+            "\n[conflict] 이미 존재하는 대상 파일:\n"
+            + "".join(f"  {p}\n" for p in existing_conflicts)
+        )
 
-    # Two-step rename to avoid collisions (old -> temp -> final)
-    temp_paths: list[tuple[Path, Path]] = []
-    for i, (old, _) in enumerate(plan, start=1):
-        temp = old.with_name(f"data{i}.xlsx")
-        old.rename(temp)
-        temp_paths.append((temp, old))
+    if dry_run:
+        if verbose:
+            print("\n[dry_run=True] No files were renamed.")
+        return result
 
-    for (temp, _old), (_old2, final) in zip(temp_paths, plan):
-        temp.rename(final)
+    if existing_conflicts:
+        raise FileExistsError(
+            f"{len(existing_conflicts)} target file(s) already exist, e.g. {existing_conflicts[0]}"
+        )
 
-    print("\nRenaming complete.")
-    return plan
+    _execute_plan(plan)
 
+    if verbose:
+        print("\nRenaming complete.")
+    return result
 
 if __name__ == "__main__":
     # xlsx만 처리